@@ -1,12 +1,14 @@
 import argparse
 import csv
+import itertools
 import logging
 import re
 import ynab
 
-from collections import namedtuple
-from datetime import datetime, timedelta
+from collections import defaultdict, deque, namedtuple
+from datetime import date, datetime, timedelta
 from imap_tools import MailBox, AND
+from typing import Optional
 from ynab.models import TransactionClearedStatus
 from ynab.models.new_transaction import NewTransaction
 
@@ -16,16 +18,45 @@ MODE_IMPORT_DEBIT_CSV = 'import_debit_csv'
 MODE_IMPORT_REVOLUT_CSV = 'import_revolut_csv'
 MODE_IMPORT_UBS_FROM_GMAIL = 'import_ubs_email_notifications'
 
-UBS_NOTIFICATION_REGEXP = '<!-- NOTIFICATION_CONTENT_BEGIN -->(.*)<!-- NOTIFICATION_CONTENT_END -->'
-UBS_CREDIT_CARD_OUTFLOW_REGEXP = r'^CHF ([\d’]+\.\d\d) have been charged to card "(\d\d\d\d)"\. (.+)\. Available amount:'
-UBS_CREDIT_CARD_INFLOW_REGEXP = r'^Amount available on card "(\d\d\d\d)": CHF'
-UBS_DEBIT_CARD_REGEXP = r'^Your account "(.+)" has been (debited|credited) CHF ([\d’]+\.\d\d)\.'
+UBS_NOTIFICATION_BEGIN_MARKER = '<!-- NOTIFICATION_CONTENT_BEGIN -->'
+UBS_NOTIFICATION_END_MARKER = '<!-- NOTIFICATION_CONTENT_END -->'
+# A single pattern for all the known notifications: the name of the matched top-level group tells the kind
+UBS_TRANSACTION_NOTIFICATION_REGEXP = re.compile(
+    r'^(?:(?P<outflow>CHF (?P<outflow_amount>[\d’]+\.\d\d) have been charged to card "(?P<outflow_card>\d\d\d\d)"\. '
+    r'(?P<outflow_payee>.+)\. Available amount:)'
+    r'|(?P<inflow>Amount available on card "(?P<inflow_card>\d\d\d\d)": CHF)'
+    r'|(?P<debit>Your account "(?P<debit_account>.+)" has been (?P<debit_action>debited|credited) CHF '
+    r'(?P<debit_amount>[\d’]+\.\d\d)\.))')
 
 # Maximum time between an outflow notification from a debit account and an inflow notification to a credit card
 MAX_CREDIT_CARD_TRANSFT_TIMEDELTA = timedelta(minutes=1)
 
 DAYS_TO_FETCH_EMAILS = 1
 
+# Maximum number of emails fetched in a single IMAP FETCH command: servers could reject too long commands
+IMAP_FETCH_BATCH_SIZE = 100
+
+# Translation table removing the thousands separator (as in "1’234.56") from UBS amounts
+AMOUNT_THOUSANDS_SEPARATOR_REMOVAL = str.maketrans('', '', '’')
+
+# Read buffer for CSV files: exports could be several megabytes
+CSV_READ_BUFFER_SIZE = 1 << 20
+
+# Number of info lines in UBS debit card CSV files before the data table
+UBS_DEBIT_CSV_INFO_LINES = 9
+
+# Maximum number of transactions sent to YNAB in a single request
+YNAB_TRANSACTIONS_BATCH_SIZE = 500
+
+
+def _toMilliunits(amount: str) -> int:
+    """Converts a decimal amount string with up to 3 fractional digits (e.g. "-1’234.56") into YNAB milliunits."""
+    amount = amount.translate(AMOUNT_THOUSANDS_SEPARATOR_REMOVAL)
+    negative = amount.startswith('-')
+    whole, _, fraction = amount.lstrip('-').partition('.')
+    milliunits = int(whole) * 1000 + int(fraction.ljust(3, '0')[:3])
+    return -milliunits if negative else milliunits
+
 
 def _populateImportIds(transactions: list[NewTransaction]):
     """Populates `import_id` in the provided list of transactions.
@@ -38,68 +69,94 @@ def _populateImportIds(transactions: list[NewTransaction]):
     Example: `UBS2YNAB:100000:2025-01-01:0`
 
     The assumption is that transactions are ordered exactly as in the UBS CSV (new-to-old).
+    Any `import_id` which is already set is overwritten so that ordinals stay continuous.
     """
+    same_date_amount_groups = defaultdict(list)
     for t in transactions:
-        if not t.import_id:
-            same_date_amount_indicies = [index for (index, item) in enumerate(
-                transactions) if (item.var_date == t.var_date and item.amount == t.amount)]
-            # Reverse the order as it's new-to-old in the original list and we need old-to-new for ordinals
-            same_date_amount_indicies.reverse()
-            for (ordinal, t_index) in enumerate(same_date_amount_indicies):
-                other_t = transactions[t_index]
-                other_t.import_id = f'UBS2YNAB:{other_t.amount}:{other_t.var_date}:{ordinal}'
+        same_date_amount_groups[(t.var_date, t.amount)].append(t)
 
+    for group in same_date_amount_groups.values():
+        # Reverse the order as it's new-to-old in the original list and we need old-to-new for ordinals
+        for (ordinal, t) in enumerate(reversed(group)):
+            t.import_id = f'UBS2YNAB:{t.amount}:{t.var_date}:{ordinal}'
 
-def _createYnabTransactions(ynab_api_client: ynab.ApiClient, budget_id: str, transactions: list[NewTransaction], dry_run: bool):
-    data = ynab.PostTransactionsWrapper()
-    data.transactions = transactions
 
+def _createYnabTransactions(ynab_api_client: ynab.ApiClient, budget_id: str, transactions: list[NewTransaction], dry_run: bool):
     transactions_api = ynab.TransactionsApi(ynab_api_client)
-    if dry_run:
-        logging.debug(
-            'The request to TransactionsApi->create_transaction (dry_run in place): %s', data)
-    else:
-        api_response = transactions_api.create_transaction(budget_id, data)
-        logging.debug(
-            'The response of TransactionsApi->create_transaction: %s', api_response)
-        logging.info('Saved transactions: %d, duplicate transactions: %d', len(
-            api_response.data.transaction_ids), len(api_response.data.duplicate_import_ids))
+
+    # Always send at least one (maybe empty) batch
+    batches = [transactions[i:i + YNAB_TRANSACTIONS_BATCH_SIZE]
+               for i in range(0, len(transactions), YNAB_TRANSACTIONS_BATCH_SIZE)] or [[]]
+    saved_count = 0
+    duplicate_count = 0
+    for batch in batches:
+        data = ynab.PostTransactionsWrapper()
+        data.transactions = batch
+
+        if dry_run:
+            logging.debug(
+                'The request to TransactionsApi->create_transaction (dry_run in place): %s', data)
+        else:
+            api_response = transactions_api.create_transaction(budget_id, data)
+            logging.debug(
+                'The response of TransactionsApi->create_transaction: %s', api_response)
+            saved_count += len(api_response.data.transaction_ids)
+            duplicate_count += len(api_response.data.duplicate_import_ids)
+
+    if not dry_run:
+        logging.info('Saved transactions: %d, duplicate transactions: %d', saved_count, duplicate_count)
 
 
 def _isCreditIncomingTransfer(payee: str):
     return payee == 'TRANSFER FROM ACCOUNT'
 
 
+def _readCsvHeader(reader) -> dict[str, int]:
+    """Reads the header row from the CSV reader and returns a mapping from column names to their indices."""
+    return {name: index for (index, name) in enumerate(next(reader))}
+
+
 def importCreditCsv(file: str, budget_id: str, account_id: str, ynab_api_client: ynab.ApiClient, dry_run: bool):
-    csvfile = open(file, newline='')
-    # UBS credit card CSV file has the first line with "sep=;"
-    csvfile.readline()
-    c = csv.DictReader(csvfile, delimiter=';')
-
-    transactions = []
-    for row in c:
-        # Last 3 rows contain a summary -- stop before getting to it
-        if not row['Account number']:
-            break
-
-        t = NewTransaction()
-        t.account_id = account_id
-        t.var_date = datetime.strptime(row['Purchase date'], '%d.%m.%Y').date()
-        t.payee_name = row['Booking text']
-        if row['Credit']:
-            t.amount = int(float(row['Credit']) * 1000)
-            t.cleared = TransactionClearedStatus.CLEARED
-        elif row['Debit']:
-            t.amount = -int(float(row['Debit']) * 1000)
-            t.cleared = TransactionClearedStatus.CLEARED
-        else:
-            # Guess the transaction direction: it's usually debit unless it's a transfer from a debit account
-            t.amount = -int(float(row['Amount']) * 1000)
-            if _isCreditIncomingTransfer(t.payee_name):
-                t.amount = -t.amount
-            t.cleared = TransactionClearedStatus.UNCLEARED
+    with open(file, newline='', encoding='utf-8', buffering=CSV_READ_BUFFER_SIZE) as csvfile:
+        # UBS credit card CSV file has the first line with "sep=;"
+        csvfile.readline()
+        c = csv.reader(csvfile, delimiter=';')
+        columns = _readCsvHeader(c)
+        account_number_column = columns['Account number']
+        purchase_date_column = columns['Purchase date']
+        booking_text_column = columns['Booking text']
+        credit_column = columns['Credit']
+        debit_column = columns['Debit']
+        amount_column = columns['Amount']
+
+        transactions = []
+        for row in c:
+            # Skip empty lines as csv.DictReader would
+            if not row:
+                continue
+            # Last rows (after an empty one) contain a summary without an account number -- stop before getting to it
+            if not row[account_number_column]:
+                break
+
+            t = NewTransaction()
+            t.account_id = account_id
+            purchase_date = row[purchase_date_column]  # DD.MM.YYYY
+            t.var_date = date(int(purchase_date[6:10]), int(purchase_date[3:5]), int(purchase_date[0:2]))
+            t.payee_name = row[booking_text_column]
+            if row[credit_column]:
+                t.amount = _toMilliunits(row[credit_column])
+                t.cleared = TransactionClearedStatus.CLEARED
+            elif row[debit_column]:
+                t.amount = -_toMilliunits(row[debit_column])
+                t.cleared = TransactionClearedStatus.CLEARED
+            else:
+                # Guess the transaction direction: it's usually debit unless it's a transfer from a debit account
+                t.amount = -_toMilliunits(row[amount_column])
+                if _isCreditIncomingTransfer(t.payee_name):
+                    t.amount = -t.amount
+                t.cleared = TransactionClearedStatus.UNCLEARED
 
-        transactions.append(t)
+            transactions.append(t)
 
     _populateImportIds(transactions)
 
@@ -107,24 +164,32 @@ def importCreditCsv(file: str, budget_id: str, account_id: str, ynab_api_client:
 
 
 def importDebitCsv(file: str, budget_id: str, account_id: str, ynab_api_client: ynab.ApiClient, dry_run: bool):
-    csvfile = open(file, newline='')
-    # UBS debit card CSV file has 9 info lines before the data table
-    for _ in range(9):
-        csvfile.readline()
-    c = csv.DictReader(csvfile, delimiter=';')
+    with open(file, newline='', encoding='utf-8', buffering=CSV_READ_BUFFER_SIZE) as csvfile:
+        # UBS debit card CSV file has info lines before the data table
+        deque(itertools.islice(csvfile, UBS_DEBIT_CSV_INFO_LINES), maxlen=0)
+        c = csv.reader(csvfile, delimiter=';')
+        columns = _readCsvHeader(c)
+        trade_date_column = columns['Trade date']
+        description1_column = columns['Description1']
+        credit_column = columns['Credit']
+        debit_column = columns['Debit']
+
+        transactions = []
+        for row in c:
+            # Skip empty lines as csv.DictReader would
+            if not row:
+                continue
 
-    transactions = []
-    for row in c:
-        t = NewTransaction()
-        t.account_id = account_id
-        t.var_date = datetime.fromisoformat(row['Trade date']).date()
-        t.payee_name = row['Description1']
-        # In UBS CSV credit amount is positive and debit amount is negative
-        str_amount = row['Credit'] if row['Credit'] else row['Debit']
-        t.amount = int(float(str_amount) * 1000)
-        t.cleared = TransactionClearedStatus.CLEARED
+            t = NewTransaction()
+            t.account_id = account_id
+            t.var_date = date.fromisoformat(row[trade_date_column][:10])
+            t.payee_name = row[description1_column]
+            # In UBS CSV credit amount is positive and debit amount is negative
+            str_amount = row[credit_column] if row[credit_column] else row[debit_column]
+            t.amount = _toMilliunits(str_amount)
+            t.cleared = TransactionClearedStatus.CLEARED
 
-        transactions.append(t)
+            transactions.append(t)
 
     _populateImportIds(transactions)
 
@@ -132,34 +197,49 @@ def importDebitCsv(file: str, budget_id: str, account_id: str, ynab_api_client:
 
 
 def importRevolutCsv(file: str, budget_id: str, account_id: str, ynab_api_client: ynab.ApiClient, dry_run: bool):
-    csvfile = open(file, newline='')
-    c = csv.DictReader(csvfile, delimiter=',')
-
-    transactions = []
-    for row in c:
-        # Ignoring everything but Current for now
-        if row['Product'] != 'Current':
-            continue
-
-        description = row['Description']
-        # Ignore the spare change account and weird 'Balance migration to another region or legal entity' transfers
-        if (row['Type'] == 'Transfer'
-            and (description.startswith('To pocket ')
-                 or description in ['Balance migration to another region or legal entity'])):
-            continue
-
-        t = NewTransaction()
-        t.account_id = account_id
-        t.var_date = datetime.fromisoformat(row['Started Date']).date()
-        t.payee_name = row['Description']
-        amount = int(float(row['Amount']) * 1000)
-        fee = int(float(row['Fee']) * 1000)
-        # TODO: Fee should probably not be deducted -- as least this is how I write it down in YNAB
-        t.amount = amount - fee
-        t.cleared = TransactionClearedStatus.CLEARED if row[
-            'State'] == 'COMPLETED' else TransactionClearedStatus.UNCLEARED
-
-        transactions.append(t)
+    with open(file, newline='', encoding='utf-8', buffering=CSV_READ_BUFFER_SIZE) as csvfile:
+        c = csv.reader(csvfile, delimiter=',')
+        columns = _readCsvHeader(c)
+        type_column = columns['Type']
+        product_column = columns['Product']
+        started_date_column = columns['Started Date']
+        description_column = columns['Description']
+        amount_column = columns['Amount']
+        fee_column = columns['Fee']
+        state_column = columns['State']
+
+        transactions = []
+        for row in c:
+            # Skip empty lines as csv.DictReader would
+            if not row:
+                continue
+
+            # Ignoring everything but Current for now
+            if row[product_column] != 'Current':
+                continue
+
+            description = row[description_column]
+            # Ignore the spare change account and weird 'Balance migration to another region or legal entity' transfers
+            if (row[type_column] == 'Transfer'
+                and (description.startswith('To pocket ')
+                     or description in ['Balance migration to another region or legal entity'])):
+                continue
+
+            t = NewTransaction()
+            t.account_id = account_id
+            # Only the date part of "YYYY-MM-DD HH:MM:SS" is needed
+            t.var_date = date.fromisoformat(row[started_date_column][:10])
+            t.payee_name = description
+            amount = _toMilliunits(row[amount_column])
+            # Fee is empty or zero for most of the rows
+            fee = row[fee_column]
+            fee = _toMilliunits(fee) if fee not in ('', '0', '0.00') else 0
+            # TODO: Fee should probably not be deducted -- as least this is how I write it down in YNAB
+            t.amount = amount - fee
+            t.cleared = TransactionClearedStatus.CLEARED if row[
+                state_column] == 'COMPLETED' else TransactionClearedStatus.UNCLEARED
+
+            transactions.append(t)
 
     # Reverse transactions: Revolut CSV is old-to-new but _populateImportIds need new-to-old
     transactions.reverse()
@@ -172,6 +252,107 @@ def importRevolutCsv(file: str, budget_id: str, account_id: str, ynab_api_client
 Notification = namedtuple('Notification', ['date', 'message'])
 
 
+def _readUbsNotification(m) -> Optional[Notification]:
+    """Returns the UBS notification found in the email or None if the email is not a UBS notification."""
+    html = m.html
+    begin = html.find(UBS_NOTIFICATION_BEGIN_MARKER)
+    end = html.find(UBS_NOTIFICATION_END_MARKER, begin + len(UBS_NOTIFICATION_BEGIN_MARKER))
+    if begin == -1 or end == -1:
+        logging.warning(f'No UBS notification found in {m}')
+        return None
+
+    return Notification(m.date, html[begin + len(UBS_NOTIFICATION_BEGIN_MARKER):end].strip())
+
+
+def _transactionsFromNotifications(notifications: list[Notification], account_map: dict[str, str]) -> list[NewTransaction]:
+    """
+    Converts UBS notifications into new-to-old YNAB transactions with import IDs populated.
+
+    Raises KeyError if an account/card of a notification is not in `account_map`.
+    """
+    # The window is computed in float seconds: cheaper than datetime/timedelta arithmetic. Email Date: headers have
+    # whole-second resolution, so the strict 60 s bound still compares exactly.
+    timestamps = [n.date.timestamp() for n in notifications]
+    # Sort by timestamp (keeping the IMAP order for the same ones) to slide the window around inflows along the list.
+    # Not by date: imap_tools returns naive dates for some headers and those can't be compared with aware ones.
+    order = sorted(range(len(notifications)), key=timestamps.__getitem__)
+    notifications = [notifications[i] for i in order]
+    timestamps = [timestamps[i] for i in order]
+    window = MAX_CREDIT_CARD_TRANSFT_TIMEDELTA.total_seconds()
+    # Parse every notification once as the inflow matching below looks at the neighbours too
+    matches = [UBS_TRANSACTION_NOTIFICATION_REGEXP.search(n.message) for n in notifications]
+    # Kept in a parallel list too: the window scan below only needs the kinds of most notifications
+    kinds = [p.lastgroup if p else None for p in matches]
+
+    transactions: list[NewTransaction] = []
+    # [lo, hi) are the notifications in the window around the current inflow: both only move forward
+    lo = hi = 0
+    for n, p, kind, timestamp in zip(notifications, matches, kinds, timestamps):
+        var_date = n.date.date()
+        if kind == 'outflow':
+            # Notifications are for charged amounts only -- so the amount is negative
+            amount = -_toMilliunits(p.group('outflow_amount'))
+            card = p.group('outflow_card')
+            payee = p.group('outflow_payee')
+
+            transactions.append(NewTransaction(
+                account_id=account_map[card], var_date=var_date, payee_name=payee, amount=amount))
+
+            logging.debug(
+                'Found credit card outflow notification: %s, %d to %s from %s', n.date, amount, payee, card)
+        elif kind == 'inflow':
+            card = p.group('inflow_card')
+
+            # Inflow email notifications from UBS don't contain amounts -- so we had to guess by the
+            # presence of the debit outflow notification around. The nearest one wins, the earlier one on a tie.
+            debit_amount = 0
+            nearest = window
+            # lo never passes the inflow itself, so it doesn't need a bound check
+            while timestamps[lo] <= timestamp - window:
+                lo += 1
+            while hi < len(timestamps) and timestamps[hi] < timestamp + window:
+                hi += 1
+            for j in range(lo, hi):
+                if kinds[j] != 'debit':
+                    continue
+                delta = abs(timestamps[j] - timestamp)
+                if delta < nearest and matches[j].group('debit_action') == 'debited':
+                    debit_amount = _toMilliunits(matches[j].group('debit_amount'))
+                    nearest = delta
+
+            if debit_amount > 0:
+                transactions.append(NewTransaction(
+                    account_id=account_map[card], var_date=var_date, amount=debit_amount))
+
+                logging.debug(
+                    'Matched credit account inflow notification: %s, %d to %s', n.date, debit_amount, card)
+            else:
+                logging.warning(
+                    'Credit inflow notification at %s doesn''t have a debit outflow nearby', n.date)
+        elif kind == 'debit':
+            account = p.group('debit_account')
+            action = p.group('debit_action')
+            amount = _toMilliunits(p.group('debit_amount'))
+            if action == 'debited':
+                amount = -amount
+
+            transactions.append(NewTransaction(
+                account_id=account_map[account], var_date=var_date, amount=amount))
+
+            logging.debug(
+                'Found debit account notification: %s, %d from %s', n.date, amount, account)
+        else:
+            logging.warning('Unknown notification at %s: %s',
+                            n.date, n.message)
+
+    # Reverse transactions: notifications are sorted old-to-new but _populateImportIds need new-to-old
+    transactions.reverse()
+
+    _populateImportIds(transactions)
+
+    return transactions
+
+
 def importUbsFromEmail(
     imap_server: str,
     email_address: str,
@@ -180,7 +361,8 @@ def importUbsFromEmail(
     budget_id: str,
     account_map: dict[str, str],
     ynab_api_client: ynab.ApiClient,
-    dry_run: bool
+    dry_run: bool,
+    sender: Optional[str] = None
 ):
     """
     Imports UBS bank transaction notifications from email and creates corresponding transactions in YNAB.
@@ -200,6 +382,7 @@ def importUbsFromEmail(
         account_map: mapping from UBS account/card identifiers (as found in notifications) to YNAB account IDs.
         ynab_api_client: An authenticated YNAB API client instance.
         dry_run: if True, transactions are parsed and logged but not sent to YNAB.
+        sender: if set, only emails from this address are fetched. The filtering is done by the IMAP server.
 
     Returns:
         None
@@ -207,100 +390,20 @@ def importUbsFromEmail(
     notifications: list[Notification] = []
     with MailBox(imap_server).login(email_address, password, folder) as mailbox:
         d = datetime.today() - timedelta(days=DAYS_TO_FETCH_EMAILS)
-        msgs = mailbox.fetch(criteria=AND(date_gte=d.date()), bulk=True)
+        criteria = AND(date_gte=d.date(), from_=sender) if sender else AND(date_gte=d.date())
+        # Keep notifications unread: imap_tools fetches them with BODY.PEEK[] then, without setting \Seen
+        msgs = mailbox.fetch(criteria=criteria, mark_seen=False, bulk=IMAP_FETCH_BATCH_SIZE)
         for m in msgs:
-            x = re.search(UBS_NOTIFICATION_REGEXP, m.html, re.DOTALL)
-            if not x:
-                logging.warning(f'No UBS notification found in {m}')
-                continue
-
-            n = x.group(1).strip()
-            notifications.append(Notification(m.date, n))
+            n = _readUbsNotification(m)
+            if n:
+                notifications.append(n)
 
     logging.info('Read %d emails.', len(notifications))
 
     if not notifications:
         return
 
-    transactions: list[NewTransaction] = []
-    for i, n in enumerate(notifications):
-        if p := re.search(UBS_CREDIT_CARD_OUTFLOW_REGEXP, n.message):
-            # Notifications are for charged amounts only -- so the sum is negative
-            sum = -float(p.group(1).replace('’', ''))
-            card = p.group(2)
-            payee = p.group(3)
-
-            t = NewTransaction()
-            t.account_id = account_map[card]
-            if not t.account_id:
-                raise KeyError(f'Card "{card}" not specified in account_map')
-            t.var_date = n.date.date()
-            t.payee_name = payee
-            t.amount = int(sum * 1000)
-
-            transactions.append(t)
-
-            logging.debug(
-                'Found credit card outflow notification: %s, %f to %s from %s', n.date, sum, payee, card)
-        elif p := re.search(UBS_CREDIT_CARD_INFLOW_REGEXP, n.message):
-            card = p.group(1)
-
-            # Inflow email notifications from UBS don't contain amounts -- so we had to guess by the
-            # presence of the debit outflow notification around
-            debit_sum = 0
-            if i > 0:
-                nn = notifications[i - 1]
-                p1 = re.search(UBS_DEBIT_CARD_REGEXP, nn.message)
-                if p1 and abs(nn.date - n.date) < MAX_CREDIT_CARD_TRANSFT_TIMEDELTA and p1.group(2) == 'debited':
-                    debit_sum = float(p1.group(3).replace('’', ''))
-
-            if debit_sum == 0 and i < len(notifications) - 1:
-                nn = notifications[i + 1]
-                p1 = re.search(UBS_DEBIT_CARD_REGEXP, nn.message)
-                if p1 and abs(nn.date - n.date) < MAX_CREDIT_CARD_TRANSFT_TIMEDELTA and p1.group(2) == 'debited':
-                    debit_sum = float(p1.group(3).replace('’', ''))
-
-            if debit_sum > 0:
-                t = NewTransaction()
-                t.account_id = account_map[card]
-                if not t.account_id:
-                    raise KeyError(f'Card "{card}" not specified in account_map')
-                t.var_date = n.date.date()
-                t.amount = int(debit_sum * 1000)
-
-                transactions.append(t)
-
-                logging.debug(
-                    'Matched credit account inflow notification: %s, %f to %s', n.date, debit_sum, card)
-            else:
-                logging.warning(
-                    'Credit inflow notification at %s doesn''t have a debit outflow nearby', n.date)
-        elif p := re.search(UBS_DEBIT_CARD_REGEXP, n.message):
-            account = p.group(1)
-            action = p.group(2)
-            sum = float(p.group(3).replace('’', ''))
-            if action == 'debited':
-                sum = -sum
-
-            t = NewTransaction()
-            t.account_id = account_map[account]
-            if not t.account_id:
-                raise KeyError(f'Account "{account}" not specified in account_map')
-            t.var_date = n.date.date()
-            t.amount = int(sum * 1000)
-
-            transactions.append(t)
-
-            logging.debug(
-                'Found debit account notification: %s, %f from %s', n.date, sum, account)
-        else:
-            logging.warning('Unknown notification at %s: %s',
-                            n.date, n.message)
-
-    # Reverse transactions: IMAP returns is old-to-new but _populateImportIds need new-to-old
-    transactions.reverse()
-
-    _populateImportIds(transactions)
+    transactions = _transactionsFromNotifications(notifications, account_map)
 
     _createYnabTransactions(ynab_api_client, budget_id, transactions, dry_run)
 
@@ -325,6 +428,8 @@ if __name__ == '__main__':
     parser.add_argument('--email_address')
     parser.add_argument('--email_password')
     parser.add_argument('--folder')
+    parser.add_argument(
+        '--ubs_sender', help='Only fetch emails from this address (the sender of UBS notifications in your mailbox)')
     parser.add_argument(
         '--account_map', help='A semicolon-separated key=value string mapping UBS card/account to YNAB account ID')
     args = parser.parse_args()
@@ -349,11 +454,15 @@ if __name__ == '__main__':
             if args.account_map is None:
                 parser.error('--account_map is required for email import!')
 
-            account_map_items = args.account_map.split(';')
-            acc_map = dict(item.split('=') for item in account_map_items)
+            acc_map = {}
+            for item in args.account_map.split(';'):
+                ubs_name, _, ynab_account_id = item.partition('=')
+                if not ubs_name or not ynab_account_id:
+                    parser.error(f'Bad --account_map item: "{item}"; expected UBS card/account=YNAB account ID')
+                acc_map[ubs_name] = ynab_account_id
 
             importUbsFromEmail(args.imap_server, args.email_address, args.email_password, args.folder, args.budget_id,
-                               acc_map, ynab_api_client, args.dry_run)
+                               acc_map, ynab_api_client, args.dry_run, args.ubs_sender)
         else:
             if args.account_id is None:
                 parser.error('--account_id is required for CSV import modes!')
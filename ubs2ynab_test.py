@@ -1,202 +1,371 @@
 import datetime
-import os
+import functools
+import io
 import ubs2ynab
 import unittest
 
 from abc import ABC
+from collections import defaultdict, namedtuple
 from parameterized import parameterized
 from pathlib import Path
-from unittest.mock import patch, MagicMock
-from ynab.models import TransactionClearedStatus
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import patch, sentinel, Mock
+
+TESTDATA_DIR = Path(__file__).parent / 'testdata'
+UBS_CREDIT_CSV = TESTDATA_DIR / 'ubs_credit_card.csv'
+UBS_DEBIT_CSV = TESTDATA_DIR / 'ubs_debit_card.csv'
+REVOLUT_CSV = TESTDATA_DIR / 'revolut.csv'
+
+
+@functools.cache
+def _read_testdata(path):
+    """Reads a test data file once per test session."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return f.read()
+
+
+# Good CSV rows and the keyword names of their columns used to override the values
+CREDIT_CSV_ROW = {
+    'Account number': 'ACC1',
+    'Purchase date': '13.01.2000',
+    'Booking text': 'Test payee',
+    'Credit': '',
+    'Debit': '',
+    'Amount': '100.00',
+}
+CREDIT_CSV_COLUMNS = {
+    'account_number': 'Account number',
+    'purchase_date': 'Purchase date',
+    'booking_text': 'Booking text',
+    'credit': 'Credit',
+    'debit': 'Debit',
+    'amount': 'Amount',
+}
+
+DEBIT_CSV_ROW = {
+    'Trade date': '2000-01-13',
+    'Description1': 'Test payee',
+    'Credit': '1.00',
+    'Debit': '',
+}
+DEBIT_CSV_COLUMNS = {
+    'trade_date': 'Trade date',
+    'description1': 'Description1',
+    'credit': 'Credit',
+    'debit': 'Debit',
+}
+
+REVOLUT_CSV_ROW = {
+    'Type': 'Card Payment',
+    'Product': 'Current',
+    'Started Date': '2020-01-13 19:20:21',
+    'Description': 'Test payee',
+    'Amount': '-50.00',
+    'Fee': '0.00',
+    'State': 'COMPLETED',
+}
+REVOLUT_CSV_COLUMNS = {
+    'type': 'Type',
+    'product': 'Product',
+    'started_date': 'Started Date',
+    'description': 'Description',
+    'amount': 'Amount',
+    'fee': 'Fee',
+    'state': 'State',
+}
+
+
+def _csv_row(template, columns, **overrides):
+    """Returns a copy of the template row with the columns (given by their keyword names) overridden."""
+    return template | {columns[name]: value for (name, value) in overrides.items()}
+
+
+class CallRecorder:
+    """A lightweight replacement for MagicMock recording the calls of a function."""
+
+    def __init__(self, return_value=None):
+        self.return_value = return_value
+        self.call_args_list = []
+
+    def __call__(self, *args, **kwargs):
+        self.call_args_list.append((args, kwargs))
+        return self.return_value
+
+    @property
+    def call_args(self):
+        return self.call_args_list[-1] if self.call_args_list else None
+
+    @property
+    def call_count(self):
+        return len(self.call_args_list)
+
+    def assert_called_once(self):
+        if self.call_count != 1:
+            raise AssertionError(f'Expected to be called once. Called {self.call_count} times.')
+
+    def assert_not_called(self):
+        if self.call_count:
+            raise AssertionError(f'Expected not to be called. Called {self.call_count} times.')
+
+    def reset_mock(self):
+        self.call_args_list.clear()
+
 
-TESTDATA_DIR = os.path.join(Path(__file__).parent, 'testdata')
+class ContextStub:
+    """A context manager returning the given object: the only magic methods needed from a MagicMock."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __enter__(self):
+        return self.value
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class TransactionsRecorder(CallRecorder):
+    """Records create_transaction() calls and indexes the transactions of the last one by their account."""
+
+    def __init__(self, return_value=None):
+        super().__init__(return_value)
+        self.last_transactions_by_account = {}
+
+    def __call__(self, budget_id, data):
+        self.last_transactions_by_account = defaultdict(list)
+        for t in data.transactions:
+            self.last_transactions_by_account[t.account_id].append(t)
+        return super().__call__(budget_id, data)
+
+    def reset_mock(self):
+        super().reset_mock()
+        self.last_transactions_by_account = {}
+
+
+class TransactionsApiStub:
+    """Records the transactions sent to YNAB."""
+
+    def __init__(self):
+        api_response = SimpleNamespace(data=SimpleNamespace(transaction_ids=[], duplicate_import_ids=[]))
+        self.create_transaction = TransactionsRecorder(return_value=api_response)
+
+
+class FakeMailbox:
+    """Serves the emails from fetch() and records its calls."""
+
+    def __init__(self):
+        self.fetch = CallRecorder(return_value=[])
 
 
 class YnabTestCase(unittest.TestCase, ABC):
 
-    def setUp(self):
-        # Mock YNAB API
-        self.mock_transactions_api = MagicMock()
-        patch('ynab.TransactionsApi',
-              return_value=self.mock_transactions_api).start()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Mock YNAB API: patched once for all the tests of the class with a fresh stub for every test
+        cls.mock_transactions_api_class = cls._start_class_patch('ynab.TransactionsApi', new_callable=Mock)
+
+    @classmethod
+    def _start_class_patch(cls, *args, **kwargs):
+        patcher = patch(*args, **kwargs)
+        cls.addClassCleanup(patcher.stop)
+        return patcher.start()
 
-        self.mock_api_client = MagicMock()
+    def _start_patch(self, *args, **kwargs):
+        patcher = patch(*args, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
 
-    def tearDown(self):
-        patch.stopall()
+    def setUp(self):
+        self.mock_transactions_api = TransactionsApiStub()
+        self.mock_transactions_api_class.return_value = self.mock_transactions_api
+
+        self.mock_api_client = sentinel.ynab_api_client
 
     def _get_transaction_arguments(self, account_id=None):
         args, _ = self.mock_transactions_api.create_transaction.call_args
         post_transaction_wrapper = args[1]
-        return [t for t in post_transaction_wrapper.transactions if account_id is None or t.account_id == account_id]
+        if account_id is None:
+            return post_transaction_wrapper.transactions
+        return self.mock_transactions_api.create_transaction.last_transactions_by_account.get(account_id, [])
 
 
 class ImportCsvLineTestCase(YnabTestCase, ABC):
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Patched through the module under test to make it clear which csv.reader() calls are intercepted
+        cls.mock_csv_reader = cls._start_class_patch('ubs2ynab.csv.reader', new_callable=Mock)
+
     def setUp(self):
         super().setUp()
 
-        self.mock_csv_dict_reader = patch('csv.DictReader').start()
+        self.mock_csv_reader.reset_mock()
 
-        # Mock open() to prevent actual file I/O during tests
-        patch('builtins.open').start()
+        # Mock open() to prevent actual file I/O during tests. Not patched for the whole class as the test runner
+        # itself uses open() between tests (e.g. to show the source code in tracebacks). The only MagicMock left:
+        # the importers use the opened file as a context manager.
+        self._start_patch('builtins.open')
 
+    def _mock_csv_rows(self, rows):
+        """Makes the mocked CSV reader return a header built from the keys of the first row followed by the rows.
 
-class ImportCreditCsvTestCase(ImportCsvLineTestCase):
+        Empty rows are returned as empty lines.
+        """
+        header = list(rows[0].keys())
+        self.mock_csv_reader.return_value = iter(
+            [header] + [[row[column] for column in header] if row else [] for row in rows])
 
-    def _good_csv_response(self,
-                           account_number='ACC1',
-                           purchase_date='13.01.2000',
-                           booking_text='Test payee',
-                           credit='',
-                           debit='',
-                           amount='100.00'):
-        return {
-            'Account number': account_number,
-            'Purchase date': purchase_date,
-            'Booking text': booking_text,
-            'Credit': credit,
-            'Debit': debit,
-            'Amount': amount
-        }
-
-    def test_import_calls_api(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+    # The import function under test and its arguments irrelevant for the tests
+    import_csv = None
+    RUN_ARGS = ('irrelevant.csv', 'some_budget_id', 'some_account_id')
+
+    def _run(self, rows, dry_run=False):
+        """Imports the rows with the import function under test."""
+        self._mock_csv_rows(rows)
+        self.import_csv(*self.RUN_ARGS, self.mock_api_client, dry_run=dry_run)
+
+
+# (name, import function, good row builder, date column, date value, payee column)
+CSV_IMPORTS = [
+    ('credit', ubs2ynab.importCreditCsv, functools.partial(_csv_row, CREDIT_CSV_ROW, CREDIT_CSV_COLUMNS),
+     'purchase_date', '12.07.2025', 'booking_text'),
+    ('debit', ubs2ynab.importDebitCsv, functools.partial(_csv_row, DEBIT_CSV_ROW, DEBIT_CSV_COLUMNS),
+     'trade_date', '2025-07-12', 'description1'),
+    ('revolut', ubs2ynab.importRevolutCsv, functools.partial(_csv_row, REVOLUT_CSV_ROW, REVOLUT_CSV_COLUMNS),
+     'started_date', '2025-07-12 11:53:59', 'description'),
+]
+
+
+class CsvImportTestCase(ImportCsvLineTestCase):
+    """Tests common for all the CSV formats."""
+
+    @parameterized.expand(CSV_IMPORTS)
+    def test_import_calls_api(self, _, import_csv, good_row, date_column, date_value, payee_column):
+        self._mock_csv_rows([good_row()])
+
+        import_csv(*self.RUN_ARGS, self.mock_api_client, dry_run=False)
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         ts = self._get_transaction_arguments()
         self.assertEqual(len(ts), 1)
 
-    def test_dry_run_import_doesnt_call_api(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
+    @parameterized.expand(CSV_IMPORTS)
+    def test_dry_run_import_doesnt_call_api(self, _, import_csv, good_row, date_column, date_value, payee_column):
+        self._mock_csv_rows([good_row()])
 
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=True)
+        import_csv(*self.RUN_ARGS, self.mock_api_client, dry_run=True)
 
         self.mock_transactions_api.create_transaction.assert_not_called()
 
-    def test_purchase_date_is_read(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            purchase_date='12.07.2025')]
+    @parameterized.expand(CSV_IMPORTS)
+    def test_date_is_read(self, _, import_csv, good_row, date_column, date_value, payee_column):
+        self._mock_csv_rows([good_row(**{date_column: date_value})])
 
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        import_csv(*self.RUN_ARGS, self.mock_api_client, dry_run=False)
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.var_date, datetime.date(2025, 7, 12))
 
-    def test_booking_text_is_read(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            booking_text='Some payee')]
+    @parameterized.expand(CSV_IMPORTS)
+    def test_payee_is_read(self, _, import_csv, good_row, date_column, date_value, payee_column):
+        self._mock_csv_rows([good_row(**{payee_column: 'Some payee'})])
 
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        import_csv(*self.RUN_ARGS, self.mock_api_client, dry_run=False)
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.payee_name, 'Some payee')
 
+
+class ImportCreditCsvTestCase(ImportCsvLineTestCase):
+
+    import_csv = staticmethod(ubs2ynab.importCreditCsv)
+
+    def _good_csv_response(self, **overrides):
+        return _csv_row(CREDIT_CSV_ROW, CREDIT_CSV_COLUMNS, **overrides)
+
     def test_credit_amount_takes_presedence_over_just_amount(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             credit='150.00',
             amount='100.00')  # Deliberately different from credit to ensure credit is used
-        ]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        ])
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.amount, 150000)
 
     def test_credit_amount_is_cleared(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            credit='150.00')]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            credit='150.00')])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.cleared, TransactionClearedStatus.CLEARED)
+        self.assertEqual(t.cleared, ubs2ynab.TransactionClearedStatus.CLEARED)
 
     def test_debit_amount_takes_presedence_over_just_amount(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             debit='150.00',
             amount='100.00')  # Deliberately different from debit to ensure debit is used
-        ]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        ])
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.amount, -150000)
 
     def test_debit_amount_is_cleared(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            debit='150.00')]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            debit='150.00')])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.cleared, TransactionClearedStatus.CLEARED)
+        self.assertEqual(t.cleared, ubs2ynab.TransactionClearedStatus.CLEARED)
 
     def test_just_amount_without_transfer_treated_as_debit(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             amount='150.00',
-            booking_text='Some payee not denoting a transfer')]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+            booking_text='Some payee not denoting a transfer')])
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.amount, -150000)
 
     def test_just_amount_with_transfer_treated_as_credit(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             amount='150.00',
-            booking_text='TRANSFER FROM ACCOUNT')]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+            booking_text='TRANSFER FROM ACCOUNT')])
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.amount, 150000)
 
     def test_just_amount_is_not_cleared(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            amount='150.00')]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            amount='150.00')])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.cleared, TransactionClearedStatus.UNCLEARED)
+        self.assertEqual(t.cleared, ubs2ynab.TransactionClearedStatus.UNCLEARED)
+
+    def test_empty_line_is_skipped(self):
+        self._run([self._good_csv_response(booking_text='First'), {},
+                   self._good_csv_response(booking_text='Second')])
+
+        payees = [t.payee_name for t in self._get_transaction_arguments()]
+        self.assertEqual(payees, ['First', 'Second'])
 
     def test_import_id_is_correct(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             purchase_date='01.01.2025',
             amount='100.00'
-        )]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        )])
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.import_id, 'UBS2YNAB:-100000:2025-01-01:0')
 
     def test_import_id_ordinal_is_desc(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            booking_text='First'), self._good_csv_response(booking_text='Second')]
-
-        ubs2ynab.importCreditCsv('irrelevant.csv', 'some_budget_id',
-                                 'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            booking_text='First'), self._good_csv_response(booking_text='Second')])
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         payees = [t.payee_name for t in self._get_transaction_arguments()]
-        ordinals = [t.import_id.split(':')[-1]
+        ordinals = [t.import_id.rpartition(':')[2]
                     for t in self._get_transaction_arguments()]
         self.assertEqual(payees, ['First', 'Second'])
         self.assertEqual(ordinals, ['1', '0'])
@@ -204,101 +373,51 @@ class ImportCreditCsvTestCase(ImportCsvLineTestCase):
 
 class ImportDebitCsvTestCase(ImportCsvLineTestCase):
 
-    def _good_csv_response(self,
-                           trade_date='2000-01-13',
-                           description1='Test payee',
-                           credit='1.00',
-                           debit='',
-                           ):
-        return {
-            'Trade date': trade_date,
-            'Description1': description1,
-            'Credit': credit,
-            'Debit': debit
-        }
-
-    def test_import_calls_api(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
+    import_csv = staticmethod(ubs2ynab.importDebitCsv)
 
-        self.mock_transactions_api.create_transaction.assert_called_once()
-        ts = self._get_transaction_arguments()
-        self.assertEqual(len(ts), 1)
+    def _good_csv_response(self, **overrides):
+        return _csv_row(DEBIT_CSV_ROW, DEBIT_CSV_COLUMNS, **overrides)
 
-    def test_dry_run_import_doesnt_call_api(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=True)
-
-        self.mock_transactions_api.create_transaction.assert_not_called()
+    def test_import_is_split_into_batches(self):
+        self._run([self._good_csv_response()] * (ubs2ynab.YNAB_TRANSACTIONS_BATCH_SIZE + 1))
 
-    def test_trade_date_is_read(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            trade_date='2025-07-12')]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.var_date, datetime.date(2025, 7, 12))
-
-    def test_description1_is_read(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            description1='Some payee')]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.payee_name, 'Some payee')
+        self.assertEqual(self.mock_transactions_api.create_transaction.call_count, 2)
+        # The last batch holds the remainder
+        ts = self._get_transaction_arguments()
+        self.assertEqual(len(ts), 1)
 
     def test_credit_amount_takes_presedence_over_debit_amount(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             credit='150.00',
             debit='100.00')  # Deliberately different from credit to ensure credit is used
-        ]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
+        ])
 
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.amount, 150000)
 
     def test_transaction_is_cleared(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response()])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.cleared, TransactionClearedStatus.CLEARED)
+        self.assertEqual(t.cleared, ubs2ynab.TransactionClearedStatus.CLEARED)
 
     def test_import_id_is_correct(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             trade_date='2025-01-01',
             credit='100.00'
-        )]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
+        )])
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.import_id, 'UBS2YNAB:100000:2025-01-01:0')
 
     def test_import_id_ordinal_is_desc(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            description1='First'), self._good_csv_response(description1='Second')]
-
-        ubs2ynab.importDebitCsv('irrelevant.csv', 'some_budget_id',
-                                'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            description1='First'), self._good_csv_response(description1='Second')])
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         payees = [t.payee_name for t in self._get_transaction_arguments()]
-        ordinals = [t.import_id.split(':')[-1]
+        ordinals = [t.import_id.rpartition(':')[2]
                     for t in self._get_transaction_arguments()]
         self.assertEqual(payees, ['First', 'Second'])
         self.assertEqual(ordinals, ['1', '0'])
@@ -306,163 +425,110 @@ class ImportDebitCsvTestCase(ImportCsvLineTestCase):
 
 class ImportRevolutCsvTestCase(ImportCsvLineTestCase):
 
-    def _good_csv_response(self,
-                           type='Card Payment',
-                           product='Current',
-                           started_date='2020-01-13 19:20:21',
-                           description='Test payee',
-                           amount='-50.00',
-                           fee='0.00',
-                           state='COMPLETED',
-                           ):
-        return {
-            'Type': type,
-            'Product': product,
-            'Started Date': started_date,
-            'Description': description,
-            'Amount': amount,
-            'Fee': fee,
-            'State': state,
-        }
-
-    def test_import_calls_api(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
-
-        self.mock_transactions_api.create_transaction.assert_called_once()
-        ts = self._get_transaction_arguments()
-        self.assertEqual(len(ts), 1)
-
-    def test_dry_run_import_doesnt_call_api(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response()]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=True)
-
-        self.mock_transactions_api.create_transaction.assert_not_called()
-
-    @parameterized.expand([
-        ('Savings',),
-        ('Made-up product'),
-    ])
-    def test_non_current_products_are_ignored(self, product):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            product=product)]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
-
-        self.mock_transactions_api.create_transaction.assert_called_once()
-        ts = self._get_transaction_arguments()
-        self.assertEqual(len(ts), 0)
-
-    @parameterized.expand([
-        ('To pocket CHF For a rainy day',),
-        ('Balance migration to another region or legal entity',),
-    ])
-    def test_specific_transfers_are_ignored(self, ignored_description):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(type='Transfer',
-                                                                          description=ignored_description)]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+    import_csv = staticmethod(ubs2ynab.importRevolutCsv)
 
-        self.mock_transactions_api.create_transaction.assert_called_once()
-        ts = self._get_transaction_arguments()
-        self.assertFalse(ts)
+    def _good_csv_response(self, **overrides):
+        return _csv_row(REVOLUT_CSV_ROW, REVOLUT_CSV_COLUMNS, **overrides)
 
-    def test_started_date_is_read(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            started_date='2025-04-01 11:53:59')]
+    # Cases of the tiny tables below are looped over in a single test: no need for a setUp() per case
+    def test_non_current_products_are_ignored(self):
+        for product in ('Savings', 'Made-up product'):
+            with self.subTest(product=product):
+                self.mock_transactions_api.create_transaction.reset_mock()
+                self._run([self._good_csv_response(
+                    product=product)])
 
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+                self.mock_transactions_api.create_transaction.assert_called_once()
+                ts = self._get_transaction_arguments()
+                self.assertEqual(len(ts), 0)
 
-        t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.var_date, datetime.date(2025, 4, 1))
+    def test_specific_transfers_are_ignored(self):
+        for ignored_description in ('To pocket CHF For a rainy day',
+                                    'Balance migration to another region or legal entity'):
+            with self.subTest(description=ignored_description):
+                self.mock_transactions_api.create_transaction.reset_mock()
+                self._run([self._good_csv_response(type='Transfer',
+                                                   description=ignored_description)])
 
-    def test_description_is_read(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            description='Some payee')]
+                self.mock_transactions_api.create_transaction.assert_called_once()
+                ts = self._get_transaction_arguments()
+                self.assertFalse(ts)
 
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+    def test_fee_is_deducted_from_amount(self):
+        self._run([self._good_csv_response(
+            amount='-50.00',
+            fee='2.00')])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.payee_name, 'Some payee')
+        self.assertEqual(t.amount, -52000)  # YNAB amounts are in milliunits
 
-    def test_fee_is_deducted_from_amount(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+    def test_empty_fee_is_zero(self):
+        self._run([self._good_csv_response(
             amount='-50.00',
-            fee='2.00')]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+            fee='')])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.amount, -52000)  # YNAB amounts are in milliunits
+        self.assertEqual(t.amount, -50000)  # YNAB amounts are in milliunits
 
     def test_completed_row_is_cleared(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            state='COMPLETED')]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            state='COMPLETED')])
 
         t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.cleared, TransactionClearedStatus.CLEARED)
+        self.assertEqual(t.cleared, ubs2ynab.TransactionClearedStatus.CLEARED)
 
-    @parameterized.expand([
-        ('PENDING',),
-        ('Made-up state'),
-    ])
-    def test_non_completed_row_is_not_cleared(self, state):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            state=state)]
+    def test_non_completed_row_is_not_cleared(self):
+        for state in ('PENDING', 'Made-up state'):
+            with self.subTest(state=state):
+                self.mock_transactions_api.create_transaction.reset_mock()
+                self._run([self._good_csv_response(
+                    state=state)])
 
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.cleared, TransactionClearedStatus.UNCLEARED)
+                t = self._get_transaction_arguments()[0]
+                self.assertEqual(t.cleared, ubs2ynab.TransactionClearedStatus.UNCLEARED)
 
     def test_import_id_is_correct(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
+        self._run([self._good_csv_response(
             started_date='2025-01-01 11:53:59',
             amount='-51.23'
-        )]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+        )])
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         t = self._get_transaction_arguments()[0]
         self.assertEqual(t.import_id, 'UBS2YNAB:-51230:2025-01-01:0')
 
     def test_import_id_ordinal_is_asc(self):
-        self.mock_csv_dict_reader.return_value = [self._good_csv_response(
-            description='First'), self._good_csv_response(description='Second')]
-
-        ubs2ynab.importRevolutCsv('irrelevant.csv', 'some_budget_id',
-                                  'some_account_id', self.mock_api_client, dry_run=False)
+        self._run([self._good_csv_response(
+            description='First'), self._good_csv_response(description='Second')])
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         payees = [t.payee_name for t in self._get_transaction_arguments()]
-        ordinals = [t.import_id.split(':')[-1]
+        ordinals = [t.import_id.rpartition(':')[2]
                     for t in self._get_transaction_arguments()]
         self.assertEqual(payees, ['Second', 'First'])
         self.assertEqual(ordinals, ['1', '0'])
 
 
+class ToMilliunitsTestCase(unittest.TestCase):
+
+    def test_amounts_are_converted(self):
+        for amount, milliunits in (('12.34', 12340), ('-12.3', -12300), ('12', 12000), ('0.005', 5),
+                                   ('-1’234.567', -1234567)):
+            with self.subTest(amount=amount):
+                self.assertEqual(ubs2ynab._toMilliunits(amount), milliunits)
+
+
 class FileImportTestCase(YnabTestCase):
     """Integration tests with full example files."""
 
+    def _mock_file(self, path):
+        """Makes open() return the cached content of the file: the importers still parse it from scratch."""
+        self._start_patch('builtins.open', new_callable=Mock, return_value=io.StringIO(_read_testdata(path), newline=''))
+
     def test_full_ubs_credit_file(self):
-        csv_path = os.path.join(TESTDATA_DIR, 'ubs_credit_card.csv')
+        self._mock_file(UBS_CREDIT_CSV)
 
-        ubs2ynab.importCreditCsv(csv_path, 'some_budget_id',
+        ubs2ynab.importCreditCsv(UBS_CREDIT_CSV, 'some_budget_id',
                                  'some_account_id', self.mock_api_client, dry_run=False)
 
         self.mock_transactions_api.create_transaction.assert_called_once()
@@ -477,9 +543,9 @@ class FileImportTestCase(YnabTestCase):
                                       'UBS2YNAB:600000:2025-09-12:0'])
 
     def test_full_ubs_debit_file(self):
-        csv_path = os.path.join(TESTDATA_DIR, 'ubs_debit_card.csv')
+        self._mock_file(UBS_DEBIT_CSV)
 
-        ubs2ynab.importDebitCsv(csv_path, 'some_budget_id',
+        ubs2ynab.importDebitCsv(UBS_DEBIT_CSV, 'some_budget_id',
                                 'some_account_id', self.mock_api_client, dry_run=False)
 
         self.mock_transactions_api.create_transaction.assert_called_once()
@@ -493,9 +559,9 @@ class FileImportTestCase(YnabTestCase):
                                       'UBS2YNAB:-51590:2025-07-06:0'])
 
     def test_full_revolut_file(self):
-        csv_path = os.path.join(TESTDATA_DIR, 'revolut.csv')
+        self._mock_file(REVOLUT_CSV)
 
-        ubs2ynab.importRevolutCsv(csv_path, 'some_budget_id',
+        ubs2ynab.importRevolutCsv(REVOLUT_CSV, 'some_budget_id',
                                   'some_account_id', self.mock_api_client, dry_run=False)
 
         self.mock_transactions_api.create_transaction.assert_called_once()
@@ -508,7 +574,7 @@ class FileImportTestCase(YnabTestCase):
                                       'UBS2YNAB:-4970:2025-08-24:0',
                                       'UBS2YNAB:-29000:2025-08-25:0',
                                       'UBS2YNAB:4970:2025-08-24:0',
-                                      'UBS2YNAB:-4059:2025-08-22:0',
+                                      'UBS2YNAB:-4060:2025-08-22:0',
                                       'UBS2YNAB:-20000:2025-08-20:0',
                                       'UBS2YNAB:-37650:2025-08-17:0',
                                       'UBS2YNAB:-20000:2025-08-17:0',
@@ -522,16 +588,34 @@ class FileImportTestCase(YnabTestCase):
                                       'UBS2YNAB:-44060:2025-07-30:0'])
 
 
+# Dates of the example emails: the default one and the one for tests checking it's not just the default
+DEFAULT_EMAIL_DATE = datetime.datetime(2025, 1, 2, 10, 0, 0)
+OTHER_EMAIL_DATE = datetime.datetime(2025, 3, 4, 15, 30, 0)
+
+# Email notification templates as sent by UBS
+UBS_NOTIFICATION_EMAIL = '<!-- NOTIFICATION_CONTENT_BEGIN -->\n{notification_text}\n<!-- NOTIFICATION_CONTENT_END -->'
+CREDIT_CARD_DEBIT_NOTIFICATION = \
+    'CHF {amount} have been charged to card "{card_alias}". {payee}. Available amount: CHF {available_amount}'
+CREDIT_CARD_CREDIT_NOTIFICATION = 'Amount available on card "{card_alias}": CHF  {available_amount}.'
+DEBIT_ACCOUNT_NOTIFICATION = '''Your account "{account_alias}" has been {action} CHF {amount}.
+
+The new account balance is CHF {available_amount}.
+
+You are receiving this notification because you asked to be informed of your account transactions. You can adjust this in the settings of Digital Banking at any time.'''
+
+
+# Emails are immutable: the helpers below cache them and the same email could be returned to several tests
+Email = namedtuple('Email', ['date', 'html'])
+
+
 class UbsEmailHelper:
 
-    def mock_email(self, html, date=datetime.datetime(2025, 1, 2, 10, 0, 0)):
-        m = MagicMock()
-        m.date = date
-        m.html = html
-        return m
+    def mock_email(self, html, date=DEFAULT_EMAIL_DATE):
+        return Email(date, html)
 
-    def good_notification(self, notification_text='Some notification', date=datetime.datetime(2025, 1, 2, 10, 0, 0)):
-        return self.mock_email(f'<!-- NOTIFICATION_CONTENT_BEGIN -->\n{notification_text}\n<!-- NOTIFICATION_CONTENT_END -->', date)
+    @functools.cache
+    def good_notification(self, notification_text='Some notification', date=DEFAULT_EMAIL_DATE):
+        return self.mock_email(UBS_NOTIFICATION_EMAIL.format(notification_text=notification_text), date)
 
 
 class UbsCrediCardEmailHelper():
@@ -539,12 +623,16 @@ class UbsCrediCardEmailHelper():
     def __init__(self, ubs: UbsEmailHelper):
         self.ubs = ubs
 
-    def good_debit_notification(self, card_alias='1234', amount='56.78', payee='PAYEE', available_amount='1234.56', date=datetime.datetime(2025, 1, 2, 10, 0, 0)):
-        notification_text = f'CHF {amount} have been charged to card "{card_alias}". {payee}. Available amount: CHF {available_amount}'
+    @functools.cache
+    def good_debit_notification(self, card_alias='1234', amount='56.78', payee='PAYEE', available_amount='1234.56', date=DEFAULT_EMAIL_DATE):
+        notification_text = CREDIT_CARD_DEBIT_NOTIFICATION.format(
+            amount=amount, card_alias=card_alias, payee=payee, available_amount=available_amount)
         return self.ubs.good_notification(notification_text, date)
 
-    def good_credit_notification(self, card_alias='1234', available_amount='1234.56', date=datetime.datetime(2025, 1, 2, 10, 0, 0)):
-        notification_text = f'Amount available on card "{card_alias}": CHF  {available_amount}.'
+    @functools.cache
+    def good_credit_notification(self, card_alias='1234', available_amount='1234.56', date=DEFAULT_EMAIL_DATE):
+        notification_text = CREDIT_CARD_CREDIT_NOTIFICATION.format(
+            card_alias=card_alias, available_amount=available_amount)
         return self.ubs.good_notification(notification_text, date)
 
 
@@ -553,47 +641,56 @@ class UbsDebitCardEmailHelper():
     def __init__(self, ubs: UbsEmailHelper):
         self.ubs = ubs
 
-    def good_debit_notification(self, account_alias='Checking', amount='56.78', available_amount='1234.56', date=datetime.datetime(2025, 1, 2, 10, 0, 0)):
-        notification_test = f'''Your account "{account_alias}" has been debited CHF {amount}.
+    @functools.cache
+    def good_debit_notification(self, account_alias='Checking', amount='56.78', available_amount='1234.56', date=DEFAULT_EMAIL_DATE):
+        notification_text = DEBIT_ACCOUNT_NOTIFICATION.format(
+            account_alias=account_alias, action='debited', amount=amount, available_amount=available_amount)
+        return self.ubs.good_notification(notification_text, date)
 
-The new account balance is CHF {available_amount}.
+    @functools.cache
+    def good_credit_notification(self, account_alias='Checking', amount='56.78', available_amount='1234.56', date=DEFAULT_EMAIL_DATE):
+        notification_text = DEBIT_ACCOUNT_NOTIFICATION.format(
+            account_alias=account_alias, action='credited', amount=amount, available_amount=available_amount)
+        return self.ubs.good_notification(notification_text, date)
 
-You are receiving this notification because you asked to be informed of your account transactions. You can adjust this in the settings of Digital Banking at any time.'''
-        return self.ubs.good_notification(notification_test, date)
 
-    def good_credit_notification(self, account_alias='Checking', amount='56.78', available_amount='1234.56', date=datetime.datetime(2025, 1, 2, 10, 0, 0)):
-        notification_test = f'''Your account "{account_alias}" has been credited CHF {amount}.
+class ImportUbsFromEmailTestCase(YnabTestCase, ABC):
 
-The new account balance is CHF {available_amount}.
+    # Account maps shared by the tests: read-only so that no test could change them for the others
+    CREDIT_CARD_MAP = MappingProxyType({'1234': 'some_account_id'})
+    ACCOUNT_MAP = MappingProxyType({'Acc': 'some_account_id'})
+    CREDIT_CARD_AND_ACCOUNT_MAP = MappingProxyType({'1234': 'credit_account_id', 'Acc': 'debit_account_id'})
 
-You are receiving this notification because you asked to be informed of your account transactions. You can adjust this in the settings of Digital Banking at any time.'''
-        return self.ubs.good_notification(notification_test, date)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
 
+        # The helpers are stateless, so all the tests could share them
+        cls.ubs = UbsEmailHelper()
+        cls.credit_card = UbsCrediCardEmailHelper(cls.ubs)
+        cls.debit_card = UbsDebitCardEmailHelper(cls.ubs)
 
-class ImportUbsFromEmailTestCase(YnabTestCase, ABC):
+        # Mock the mailbox: patched once for all the tests of the class with a fresh stub for every test
+        cls.mock_mailbox_class = cls._start_class_patch('ubs2ynab.MailBox', new_callable=Mock)
 
     def setUp(self):
         super().setUp()
 
-        self.ubs = UbsEmailHelper()
-        self.credit_card = UbsCrediCardEmailHelper(self.ubs)
-        self.debit_card = UbsDebitCardEmailHelper(self.ubs)
-
-        mock_mailbox_object = MagicMock()
-        patch('ubs2ynab.MailBox', return_value=mock_mailbox_object).start()
-        self.mock_mailbox = MagicMock()
-        mock_mailbox_object.login.return_value.__enter__.return_value = self.mock_mailbox
+        self.mock_mailbox = FakeMailbox()
+        self.mock_mailbox_class.return_value.login.return_value = ContextStub(self.mock_mailbox)
 
-    def tearDown(self):
-        super().tearDown()
-        patch.stopall()
+    def _read_transactions(self, emails, account_map, account_id=None):
+        """Reads the transactions from the emails directly: without the mailbox and YNAB API stubs."""
+        notifications = [n for n in map(ubs2ynab._readUbsNotification, emails) if n]
+        transactions = ubs2ynab._transactionsFromNotifications(notifications, account_map)
+        return [t for t in transactions if account_id is None or t.account_id == account_id]
 
 
 class GeneralImportUbsFromEmailTestCase(ImportUbsFromEmailTestCase):
 
     def test_no_emails_doesnt_call_api(self):
         self.mock_mailbox.fetch.return_value = []
-        account_map = {'1234': 'some_account_id'}
+        account_map = self.CREDIT_CARD_MAP
 
         ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
                                     'some_budget_id', account_map, self.mock_api_client, dry_run=False)
@@ -603,7 +700,17 @@ class GeneralImportUbsFromEmailTestCase(ImportUbsFromEmailTestCase):
     def test_non_ubs_email_doesnt_call_api(self):
         self.mock_mailbox.fetch.return_value = [
             self.ubs.mock_email('Some random email content')]
-        account_map = {'1234': 'some_account_id'}
+        account_map = self.CREDIT_CARD_MAP
+
+        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
+                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+
+        self.mock_transactions_api.create_transaction.assert_not_called()
+
+    def test_ubs_email_without_end_marker_doesnt_call_api(self):
+        self.mock_mailbox.fetch.return_value = [
+            self.ubs.mock_email('<!-- NOTIFICATION_CONTENT_BEGIN -->\nSome notification')]
+        account_map = self.CREDIT_CARD_MAP
 
         ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
                                     'some_budget_id', account_map, self.mock_api_client, dry_run=False)
@@ -621,7 +728,7 @@ class GeneralImportUbsFromEmailTestCase(ImportUbsFromEmailTestCase):
 
         self.mock_transactions_api.create_transaction.assert_called_once()
         payees = [t.payee_name for t in self._get_transaction_arguments()]
-        ordinals = [t.import_id.split(':')[-1]
+        ordinals = [t.import_id.rpartition(':')[2]
                     for t in self._get_transaction_arguments()]
         # Debit card notification has no payee
         self.assertEqual(payees, [None, 'First'])
@@ -630,7 +737,7 @@ class GeneralImportUbsFromEmailTestCase(ImportUbsFromEmailTestCase):
     def test_usb_email_calls_api(self):
         self.mock_mailbox.fetch.return_value = [
             self.credit_card.good_debit_notification(card_alias='1234')]
-        account_map = {'1234': 'some_account_id'}
+        account_map = self.CREDIT_CARD_MAP
 
         ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
                                     'some_budget_id', account_map, self.mock_api_client, dry_run=False)
@@ -639,10 +746,41 @@ class GeneralImportUbsFromEmailTestCase(ImportUbsFromEmailTestCase):
         ts = self._get_transaction_arguments()
         self.assertEqual(len(ts), 1)
 
+    def test_emails_are_not_marked_seen(self):
+        self.mock_mailbox.fetch.return_value = []
+        account_map = self.CREDIT_CARD_MAP
+
+        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
+                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+
+        _, kwargs = self.mock_mailbox.fetch.call_args
+        self.assertFalse(kwargs['mark_seen'])
+
+    def test_all_senders_are_fetched_by_default(self):
+        self.mock_mailbox.fetch.return_value = []
+        account_map = self.CREDIT_CARD_MAP
+
+        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
+                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+
+        _, kwargs = self.mock_mailbox.fetch.call_args
+        self.assertNotIn('FROM', str(kwargs['criteria']))
+
+    def test_sender_is_filtered_by_server(self):
+        self.mock_mailbox.fetch.return_value = []
+        account_map = self.CREDIT_CARD_MAP
+
+        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
+                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False,
+                                    sender='notifications@example.com')
+
+        _, kwargs = self.mock_mailbox.fetch.call_args
+        self.assertIn('FROM "notifications@example.com"', str(kwargs['criteria']))
+
     def test_dry_run_import_doesnt_call_api(self):
         self.mock_mailbox.fetch.return_value = [
             self.credit_card.good_debit_notification(card_alias='1234')]
-        account_map = {'1234': 'some_account_id'}
+        account_map = self.CREDIT_CARD_MAP
 
         ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
                                     'some_budget_id', account_map, self.mock_api_client, dry_run=True)
@@ -653,167 +791,167 @@ class GeneralImportUbsFromEmailTestCase(ImportUbsFromEmailTestCase):
 class UbsCreditCardNotificationTestCase(ImportUbsFromEmailTestCase):
 
     def test_card_not_in_map_raises_error_for_debit(self):
-        self.mock_mailbox.fetch.return_value = [self.credit_card.good_debit_notification(card_alias='1234')]
+        emails = [self.credit_card.good_debit_notification(card_alias='1234')]
         account_map = {}  # No mapping for card alias '1234'
 
-        self.assertRaises(KeyError, ubs2ynab.importUbsFromEmail, 'some_server', 'some_email', 'some_password', 'some_mailbox',
-                          'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+        self.assertRaises(KeyError, self._read_transactions, emails, account_map)
 
     def test_debit_account_is_matched_by_card(self):
         msg = self.credit_card.good_debit_notification(card_alias='1234')
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'1234': 'some_account_id'}
+        account_map = self.CREDIT_CARD_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.account_id, 'some_account_id')
 
     def test_debit_amount_is_negativ(self):
         msg = self.credit_card.good_debit_notification(
             card_alias='1234', amount='56.78')
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'1234': 'some_account_id'}
-
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+        account_map = self.CREDIT_CARD_MAP
 
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.amount, -56780)  # YNAB amounts are in milliunits
 
     def test_debit_date_is_read_from_email(self):
         msg = self.credit_card.good_debit_notification(
-            card_alias='1234', date=datetime.datetime(2025, 3, 4, 15, 30, 0))
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'1234': 'some_account_id'}
+            card_alias='1234', date=OTHER_EMAIL_DATE)
+        account_map = self.CREDIT_CARD_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.var_date, datetime.date(2025, 3, 4))
 
     def test_debit_payee_is_read(self):
         msg = self.credit_card.good_debit_notification(
             card_alias='1234', payee='Somemarkt AG')
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'1234': 'some_account_id'}
+        account_map = self.CREDIT_CARD_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.payee_name, 'Somemarkt AG')
 
     def test_debit_import_id_is_correct(self):
         msg = self.credit_card.good_debit_notification(
-            card_alias='1234', amount='51.23', date=datetime.datetime(2025, 3, 4, 15, 30, 0))
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'1234': 'some_account_id'}
+            card_alias='1234', amount='51.23', date=OTHER_EMAIL_DATE)
+        account_map = self.CREDIT_CARD_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.import_id, 'UBS2YNAB:-51230:2025-03-04:0')
 
     def test_lone_credit_email_is_ignored(self):
-        self.mock_mailbox.fetch.return_value = [
-            self.credit_card.good_credit_notification()]
-
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', {}, self.mock_api_client, dry_run=False)
-
-        self.assertFalse(self._get_transaction_arguments())
+        emails = [self.credit_card.good_credit_notification()]
 
-    @parameterized.expand([1, 59, 120])
-    def test_credit_email_with_random_email_seconds_after_is_ignored(self, seconds_after):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
-                                                self.ubs.good_notification(date=date + datetime.timedelta(seconds=seconds_after)),]
-        account_map = {'1234': 'some_account_id'}
+        self.assertFalse(self._read_transactions(emails, {}))
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+    def test_credit_email_with_random_email_seconds_after_is_ignored(self):
+        for seconds_after in (1, 59, 120):
+            with self.subTest(seconds_after=seconds_after):
+                date = DEFAULT_EMAIL_DATE
+                emails = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
+                          self.ubs.good_notification(date=date + datetime.timedelta(seconds=seconds_after)),]
+                account_map = self.CREDIT_CARD_MAP
 
-        self.assertFalse(self._get_transaction_arguments('some_account_id'))
+                self.assertFalse(self._read_transactions(emails, account_map, 'some_account_id'))
 
-    @parameterized.expand([1, 59, 120])
-    def test_credit_email_with_random_ubs_email_seconds_before_is_ignored(self, seconds_before):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.ubs.good_notification(date=date - datetime.timedelta(seconds=seconds_before)),
-                                                self.credit_card.good_credit_notification(card_alias='1234', date=date)]
-        account_map = {'1234': 'some_account_id'}
+    def test_credit_email_with_random_ubs_email_seconds_before_is_ignored(self):
+        for seconds_before in (1, 59, 120):
+            with self.subTest(seconds_before=seconds_before):
+                date = DEFAULT_EMAIL_DATE
+                emails = [self.ubs.good_notification(date=date - datetime.timedelta(seconds=seconds_before)),
+                          self.credit_card.good_credit_notification(card_alias='1234', date=date)]
+                account_map = self.CREDIT_CARD_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+                self.assertFalse(self._read_transactions(emails, account_map, 'some_account_id'))
 
-        self.assertFalse(self._get_transaction_arguments('some_account_id'))
+    def test_credit_gets_amount_from_debit_email_after(self):
+        for seconds_after in (1, 59):
+            with self.subTest(seconds_after=seconds_after):
+                date = DEFAULT_EMAIL_DATE
+                emails = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
+                          self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date + datetime.timedelta(seconds=seconds_after)),]
+                account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
 
-    @parameterized.expand([1, 59])
-    def test_credit_gets_amount_from_debit_email_after(self, seconds_after):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
-                                                self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date + datetime.timedelta(seconds=seconds_after)),]
-        account_map = {'1234': 'credit_account_id', 'Acc': 'debit_account_id'}
-
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments('credit_account_id')[0]
-        self.assertEqual(t.amount, 123450)  # YNAB amounts are in milliunits
+                t = self._read_transactions(emails, account_map, 'credit_account_id')[0]
+                self.assertEqual(t.amount, 123450)  # YNAB amounts are in milliunits
 
     def test_credit_not_created_when_debit_email_is_too_after(self):
-        debit_card = UbsDebitCardNotificationTestCase()
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
-                                                self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date + datetime.timedelta(seconds=60)),]
-        account_map = {'1234': 'credit_account_id', 'Acc': 'debit_account_id'}
+        date = DEFAULT_EMAIL_DATE
+        emails = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
+                  self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date + datetime.timedelta(seconds=60)),]
+        account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+        self.assertFalse(self._read_transactions(emails, account_map, 'credit_account_id'))
 
-        self.assertFalse(self._get_transaction_arguments('credit_account_id'))
+    def test_credit_gets_amount_from_debit_email_before(self):
+        for seconds_after in (1, 59):
+            with self.subTest(seconds_after=seconds_after):
+                date = DEFAULT_EMAIL_DATE
+                emails = [self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date - datetime.timedelta(seconds=seconds_after)),
+                          self.credit_card.good_credit_notification(card_alias='1234', date=date)]
+                account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
 
-    @parameterized.expand([1, 59])
-    def test_credit_gets_amount_from_debit_email_before(self, seconds_after):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date - datetime.timedelta(seconds=seconds_after)),
-                                                self.credit_card.good_credit_notification(card_alias='1234', date=date)]
-        account_map = {'1234': 'credit_account_id', 'Acc': 'debit_account_id'}
+                t = self._read_transactions(emails, account_map, 'credit_account_id')[0]
+                self.assertEqual(t.amount, 123450)  # YNAB amounts are in milliunits
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+    def test_credit_not_created_when_debit_email_is_too_before(self):
+        date = DEFAULT_EMAIL_DATE
+        emails = [self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date - datetime.timedelta(seconds=60)),
+                  self.credit_card.good_credit_notification(card_alias='1234', date=date)]
+        account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
 
-        t = self._get_transaction_arguments('credit_account_id')[0]
-        self.assertEqual(t.amount, 123450)  # YNAB amounts are in milliunits
+        self.assertFalse(self._read_transactions(emails, account_map, 'credit_account_id'))
 
-    def test_credit_not_created_when_debit_email_is_too_before(self):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date - datetime.timedelta(seconds=60)),
-                                                self.credit_card.good_credit_notification(card_alias='1234', date=date)]
-        account_map = {'1234': 'credit_account_id', 'Acc': 'debit_account_id'}
+    def test_credit_gets_amount_from_debit_email_behind_other_email(self):
+        date = DEFAULT_EMAIL_DATE
+        emails = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
+                  self.ubs.good_notification(date=date + datetime.timedelta(seconds=1)),
+                  self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date + datetime.timedelta(seconds=2)),]
+        account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+        t = self._read_transactions(emails, account_map, 'credit_account_id')[0]
+        self.assertEqual(t.amount, 123450)  # YNAB amounts are in milliunits
 
-        self.assertFalse(self._get_transaction_arguments('credit_account_id'))
+    def test_credit_gets_amount_from_nearest_debit_email(self):
+        date = DEFAULT_EMAIL_DATE
+        emails = [self.debit_card.good_debit_notification(account_alias='Acc', amount='11.11', date=date - datetime.timedelta(seconds=30)),
+                  self.credit_card.good_credit_notification(card_alias='1234', date=date),
+                  self.debit_card.good_debit_notification(account_alias='Acc', amount='22.22', date=date + datetime.timedelta(seconds=10)),]
+        account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
+
+        t = self._read_transactions(emails, account_map, 'credit_account_id')[0]
+        self.assertEqual(t.amount, 22220)  # YNAB amounts are in milliunits
+
+    def test_credits_get_amounts_from_their_debit_emails(self):
+        date = DEFAULT_EMAIL_DATE
+        emails = [self.debit_card.good_debit_notification(account_alias='Acc', amount='11.11', date=date),
+                  self.credit_card.good_credit_notification(card_alias='1234', date=date + datetime.timedelta(seconds=1)),
+                  self.debit_card.good_debit_notification(account_alias='Acc', amount='22.22', date=date + datetime.timedelta(seconds=30)),
+                  self.credit_card.good_credit_notification(card_alias='1234', date=date + datetime.timedelta(seconds=31)),]
+        account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
+
+        amounts = [t.amount for t in self._read_transactions(emails, account_map, 'credit_account_id')]
+        self.assertEqual(amounts, [22220, 11110])  # New-to-old
+
+    def test_naive_and_aware_email_dates_are_read_together(self):
+        # imap_tools gives naive dates for "-0000" zones and unparseable headers, aware ones otherwise
+        aware_date = datetime.datetime(2025, 1, 2, 10, 0, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=1)))
+        naive_date = datetime.datetime(2025, 1, 3, 10, 0, 0)
+        emails = [self.credit_card.good_debit_notification(card_alias='1234', payee='First', date=aware_date),
+                  self.credit_card.good_debit_notification(card_alias='1234', payee='Second', date=naive_date)]
+
+        payees = [t.payee_name for t in self._read_transactions(emails, self.CREDIT_CARD_MAP)]
+        self.assertEqual(payees, ['Second', 'First'])  # New-to-old
 
     def test_card_not_in_map_raises_error_for_credit(self):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
-        self.mock_mailbox.fetch.return_value = [self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date - datetime.timedelta(seconds=1)),
-                                                self.credit_card.good_credit_notification(card_alias='1234', date=date)]
+        date = DEFAULT_EMAIL_DATE
+        emails = [self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date - datetime.timedelta(seconds=1)),
+                  self.credit_card.good_credit_notification(card_alias='1234', date=date)]
         account_map = {'Acc': 'debit_account_id'}   # No mapping for card alias '1234'
 
-        self.assertRaises(KeyError, ubs2ynab.importUbsFromEmail, 'some_server', 'some_email', 'some_password', 'some_mailbox',
-                          'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+        self.assertRaises(KeyError, self._read_transactions, emails, account_map)
 
     def test_credit_import_id_is_correct(self):
-        date = datetime.datetime(2025, 1, 2, 10, 0, 0)
+        date = DEFAULT_EMAIL_DATE
         self.mock_mailbox.fetch.return_value = [self.credit_card.good_credit_notification(card_alias='1234', date=date),
                                                 self.debit_card.good_debit_notification(account_alias='Acc', amount='123.45', date=date + datetime.timedelta(seconds=1)),]
-        account_map = {'1234': 'credit_account_id', 'Acc': 'debit_account_id'}
+        account_map = self.CREDIT_CARD_AND_ACCOUNT_MAP
 
         ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
                                     'some_budget_id', account_map, self.mock_api_client, dry_run=False)
@@ -828,94 +966,83 @@ class UbsCreditCardNotificationTestCase(ImportUbsFromEmailTestCase):
 class UbsDebitCardNotificationTestCase(ImportUbsFromEmailTestCase):
 
     def test_card_not_in_map_raises_error_for_credit(self):
-        self.mock_mailbox.fetch.return_value = [self.debit_card.good_credit_notification(account_alias='Acc')]
+        emails = [self.debit_card.good_credit_notification(account_alias='Acc')]
         account_map = {}  # No mapping for card alias 'Acc'
 
-        self.assertRaises(KeyError, ubs2ynab.importUbsFromEmail, 'some_server', 'some_email', 'some_password', 'some_mailbox',
-                          'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+        self.assertRaises(KeyError, self._read_transactions, emails, account_map)
 
     def test_card_not_in_map_raises_error_for_debit(self):
-        self.mock_mailbox.fetch.return_value = [self.debit_card.good_debit_notification(account_alias='Acc')]
+        emails = [self.debit_card.good_debit_notification(account_alias='Acc')]
         account_map = {}  # No mapping for card alias 'Acc'
 
-        self.assertRaises(KeyError, ubs2ynab.importUbsFromEmail, 'some_server', 'some_email', 'some_password', 'some_mailbox',
-                          'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-    @parameterized.expand(['credit', 'debit'])
-    def test_account_is_matched_by_alias(self, kind):
-        msg = self.debit_card.good_credit_notification(
-            account_alias='Acc') if kind == 'credit' else self.debit_card.good_debit_notification(account_alias='Acc')
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'Acc': 'some_account_id'}
+        self.assertRaises(KeyError, self._read_transactions, emails, account_map)
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+    def test_account_is_matched_by_alias(self):
+        for kind in ('credit', 'debit'):
+            with self.subTest(kind=kind):
+                self.mock_transactions_api.create_transaction.reset_mock()
+                msg = self.debit_card.good_credit_notification(
+                    account_alias='Acc') if kind == 'credit' else self.debit_card.good_debit_notification(account_alias='Acc')
+                self.mock_mailbox.fetch.return_value = [msg]
+                account_map = self.ACCOUNT_MAP
 
-        t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.account_id, 'some_account_id')
+                ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
+                                            'some_budget_id', account_map, self.mock_api_client, dry_run=False)
 
-    @parameterized.expand(['credit', 'debit'])
-    def test_date_is_read_from_email(self, kind):
-        d = datetime.datetime(2025, 3, 4, 15, 30, 0)
-        msg = self.debit_card.good_credit_notification(
-            account_alias='Acc', date=d) if kind == 'credit' else self.debit_card.good_debit_notification(account_alias='Acc', date=d)
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'Acc': 'some_account_id'}
+                t = self._get_transaction_arguments()[0]
+                self.assertEqual(t.account_id, 'some_account_id')
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
+    def test_date_is_read_from_email(self):
+        for kind in ('credit', 'debit'):
+            with self.subTest(kind=kind):
+                d = OTHER_EMAIL_DATE
+                msg = self.debit_card.good_credit_notification(
+                    account_alias='Acc', date=d) if kind == 'credit' else self.debit_card.good_debit_notification(account_alias='Acc', date=d)
+                account_map = self.ACCOUNT_MAP
 
-        t = self._get_transaction_arguments()[0]
-        self.assertEqual(t.var_date, datetime.date(2025, 3, 4))
+                t = self._read_transactions([msg], account_map)[0]
+                self.assertEqual(t.var_date, datetime.date(2025, 3, 4))
 
     def test_debit_amount_is_negativ(self):
         msg = self.debit_card.good_debit_notification(
             account_alias='Acc', amount='12.34')
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'Acc': 'some_account_id'}
+        account_map = self.ACCOUNT_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.amount, -12340)  # YNAB amounts are in milliunits
 
     def test_debit_import_id_is_correct(self):
-        date = datetime.datetime(2025, 3, 4, 15, 30, 0)
+        date = OTHER_EMAIL_DATE
         msg = self.debit_card.good_debit_notification(
             account_alias='Acc', amount='12.34', date=date)
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'Acc': 'some_account_id'}
+        account_map = self.ACCOUNT_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.import_id, 'UBS2YNAB:-12340:2025-03-04:0')
 
     def test_credit_amount_is_positiv(self):
         msg = self.debit_card.good_credit_notification(
             account_alias='Acc', amount='12.34')
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'Acc': 'some_account_id'}
+        account_map = self.ACCOUNT_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.amount, 12340)  # YNAB amounts are in milliunits
 
+    def test_amount_with_thousands_separator_is_read(self):
+        msg = self.debit_card.good_credit_notification(
+            account_alias='Acc', amount='1’234.05')
+        account_map = self.ACCOUNT_MAP
+
+        t = self._read_transactions([msg], account_map)[0]
+        self.assertEqual(t.amount, 1234050)  # YNAB amounts are in milliunits
+
     def test_credit_import_id_is_correct(self):
-        date = datetime.datetime(2025, 3, 4, 15, 30, 0)
+        date = OTHER_EMAIL_DATE
         msg = self.debit_card.good_credit_notification(
             account_alias='Acc', amount='12.34', date=date)
-        self.mock_mailbox.fetch.return_value = [msg]
-        account_map = {'Acc': 'some_account_id'}
+        account_map = self.ACCOUNT_MAP
 
-        ubs2ynab.importUbsFromEmail('some_server', 'some_email', 'some_password', 'some_mailbox',
-                                    'some_budget_id', account_map, self.mock_api_client, dry_run=False)
-
-        t = self._get_transaction_arguments()[0]
+        t = self._read_transactions([msg], account_map)[0]
         self.assertEqual(t.import_id, 'UBS2YNAB:12340:2025-03-04:0')
 
 